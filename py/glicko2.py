@@ -23,8 +23,126 @@
 #
 
 
+import array
 import math
-import copy
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+    _HAVE_NUMBA = True
+except ImportError:
+    # numba is optional; without it the core runs as plain NumPy code
+    def njit(*args, **kwargs):
+        def wrap(func):
+            return func
+        return wrap
+    prange = range
+    _HAVE_NUMBA = False
+
+
+# Glicko <-> Glicko-2 scale factor, and the 3/pi^2 constant used by g()
+_SCALE           = 173.7178
+_INV_PI2_TIMES_3 = 3.0 / (math.pi * math.pi)
+
+
+@njit(cache=True, fastmath=True, nogil=True)
+def _solve_volatility(a, dev2, variance, delta2, tau2):
+    """
+    Newton solve for the new volatility.  Takes a = ln(volatility^2) plus the
+    squared loop invariants, iterates to relative convergence (capped to
+    bound worst-case latency), and returns the new volatility.
+    """
+
+    # alias math.exp as a local; on the interpreted fallback path this skips
+    # a LOAD_ATTR per call inside the Newton loop
+    exp = math.exp
+
+    x_new = a
+    for _ in range(30):
+        x     = x_new
+        ex    = exp(x)
+        d     = dev2 + variance + ex
+        d2    = d * d
+        h1    = -(x - a)/tau2 - 0.5*ex/d + 0.5*ex*delta2/d2
+        h2    = -1.0/tau2 - 0.5*ex*(dev2 + variance)/d2 + 0.5*delta2*ex*(dev2 + variance - ex)/(d*d2)
+        x_new = x - h1/h2
+        if abs(x - x_new) <= 0.0000001 * (1.0 + abs(x_new)):
+            break
+    return exp(x_new / 2.0)
+
+
+if not _HAVE_NUMBA:
+    # prefer the Cython-compiled solver when numba is unavailable; build it
+    # with `python setup.py build_ext --inplace` in this directory
+    try:
+        from glicko2_core import solve_volatility as _solve_volatility
+    except ImportError:
+        pass
+
+
+@njit(cache=True, fastmath=True, nogil=True)
+def _volatility_update(rating, deviation, volatility, variance, delta_sum, tau):
+    """
+    Scalar tail of the rating period update: solve for the new volatility
+    with Newton's method, then derive the new deviation and rating.
+    """
+
+    # determine new volatility (loop invariants hoisted into the solver args)
+    delta          = variance * delta_sum
+    dev2           = deviation * deviation
+    a              = math.log( volatility * volatility )
+    new_volatility = _solve_volatility(a, dev2, variance, delta * delta, tau * tau)
+
+    # update the rating deviation to the new pre-rating period value
+    pre_deviation2 = dev2 + new_volatility * new_volatility
+
+    # update the rating and deviation
+    new_deviation = 1.0 / (math.sqrt( 1.0/pre_deviation2 + 1.0 / variance))
+    new_rating    = rating + delta_sum * (new_deviation * new_deviation)
+
+    return (new_rating, new_deviation, new_volatility)
+
+
+@njit(cache=True, fastmath=True, nogil=True)
+def _glicko2_update(rating, deviation, volatility, rat_opp, dev_opp, res_arr, tau):
+    """
+    Numerical core of a single player's rating period update.  Takes raw
+    Glicko-2 scale floats plus float64 opponent arrays so it can be JIT
+    compiled, and returns the new (rating, deviation, volatility) tuple.
+    """
+
+    # compute g and E for all opponents in one vectorized pass
+    g_arr = 1.0 / np.sqrt(1.0 + _INV_PI2_TIMES_3 * dev_opp * dev_opp)
+    E_arr = 1.0 / (1.0 + np.exp(-g_arr * (rating - rat_opp)))
+
+    # compute variance
+    variance = 1.0 / (g_arr * g_arr * E_arr * (1.0 - E_arr)).sum()
+
+    # compute delta numerator
+    delta_sum = (g_arr * (res_arr - E_arr)).sum()
+
+    return _volatility_update(rating, deviation, volatility, variance, delta_sum, tau)
+
+
+@njit(cache=True, parallel=True, fastmath=True, nogil=True)
+def _newton_all(rating, deviation, volatility, variance, delta_sum, tau):
+    """
+    Run the volatility Newton solve for every player in a roster.  The
+    per-player iterations are independent, so prange distributes them
+    across cores.
+    """
+    n     = len(rating)
+    out_r = np.empty(n, dtype=np.float64)
+    out_d = np.empty(n, dtype=np.float64)
+    out_v = np.empty(n, dtype=np.float64)
+    for i in prange(n):
+        r, d, v = _volatility_update(rating[i], deviation[i], volatility[i],
+                                     variance[i], delta_sum[i], tau)
+        out_r[i] = r
+        out_d[i] = d
+        out_v[i] = v
+    return (out_r, out_d, out_v)
 
 
 class Glicko2:
@@ -47,6 +165,11 @@ class Glicko2:
 
     dvolatility = 0.3
 
+    # no per-instance __dict__: large rosters stay compact and attribute
+    # access in the hot paths is a fixed-offset lookup
+    __slots__ = ('__rating', '__deviation', '__volatility',
+                 '__opp_ratings', '__opp_deviations', '__results')
+
     def __init__ (self, rating = 1500.0, deviation = 350.0, volatility = 0.06):
         """
         Constructor with rating, rating deviation, and volatility optionally
@@ -59,18 +182,34 @@ class Glicko2:
         self.__deviation  = 0.0
         self.__volatility = 0.0
 
-        # create empty result lists
-        self.__opponents = []
-        self.__results   = []
+        # create empty result arrays
+        self.__opp_ratings    = array.array('d')
+        self.__opp_deviations = array.array('d')
+        self.__results        = array.array('d')
 
         # initialize state
         self.SetRating(rating)
         self.SetDeviation(deviation)
         self.SetVolatility(volatility)
 
-    def __cmp__(self, other):
-        """Comparison operator"""
-        return cmp( self.__rating, other.__rating )
+    def __lt__(self, other):
+        """Comparison operator; sorts players by rating."""
+        return self.__rating < other.__rating
+
+    def __copy__(self):
+        """
+        Cheap copy protocol support: duplicates the rating state directly,
+        skipping the generic __reduce_ex__ machinery.  Pending results are
+        not carried over.
+        """
+        c = Glicko2.__new__(Glicko2)
+        c.__rating     = self.__rating
+        c.__deviation  = self.__deviation
+        c.__volatility = self.__volatility
+        c.__opp_ratings    = array.array('d')
+        c.__opp_deviations = array.array('d')
+        c.__results        = array.array('d')
+        return c
 
 
     def GetRating (self):
@@ -78,14 +217,14 @@ class Glicko2:
         Get the current rating.  This rating is a Glicko rating, not a Glicko2 rating.
         For details, please see http://www.glicko.com/
         """
-        return (self.__rating * 173.7178) + 1500.0
+        return (self.__rating * _SCALE) + 1500.0
 
     def GetDeviation (self):
         """
         Get the current rating deviation.  This is a Glicko rating deviation, not a 
         Glicko-2 RD.  For details, please see http://www.glicko.com/
         """
-        return self.__deviation * 173.7178
+        return self.__deviation * _SCALE
 
     def GetVolatility (self):
         """
@@ -93,19 +232,26 @@ class Glicko2:
         """
         return self.__volatility
 
+    def GetInternalState (self):
+        """
+        Get the internal Glicko-2 scale (rating, deviation) pair.  This is the
+        snapshot AddResult() records for an opponent.
+        """
+        return (self.__rating, self.__deviation)
+
     def SetRating (self, rating):
         """
         Set Glicko rating.  Internally this is converted to a Glicko2 rating.
         For details, please see http://www.glicko.com/
         """
-        self.__rating = (rating - 1500.0) / 173.7178
+        self.__rating = (rating - 1500.0) / _SCALE
 
     def SetDeviation(self, deviation):
         """
         Set Glicko rating deviation.  Internally this is converted to a Glicko-2 RD.
         For details, please see http://www.glicko.com/
         """
-        self.__deviation = deviation / 173.7178
+        self.__deviation = deviation / _SCALE
 
     def SetVolatility(self, volatility):
         """
@@ -119,16 +265,33 @@ class Glicko2:
         and/or AddDraw().  This method is called automatically whenever Update()
         is called.
         """
-        self.__opponents = []
-        self.__results   = []
+        self.__opp_ratings    = array.array('d')
+        self.__opp_deviations = array.array('d')
+        self.__results        = array.array('d')
 
     def AddResult (self, opponent, result):
         """
         Add a result to this rating.  Note that no calculation is performed until
         Update() is called.
         """
-        self.__opponents.append(copy.copy(opponent))
-        self.__results.append(copy.copy(result)) # copy probably not needed
+        # snapshot only the two floats Update() actually needs
+        r, d = opponent.GetInternalState()
+        self.__opp_ratings.append(r)
+        self.__opp_deviations.append(d)
+        self.__results.append(result)
+
+    def AddResults (self, opponents, result):
+        """
+        Add the same result against every opponent in a sequence.  Equivalent
+        to calling AddResult() once per opponent, but extends the pending
+        lists in bulk -- useful for race-style events where a competitor beats
+        (or loses to) a whole group of finishers at once.
+        """
+        for o in opponents:
+            r, d = o.GetInternalState()
+            self.__opp_ratings.append(r)
+            self.__opp_deviations.append(d)
+        self.__results.extend([result] * len(opponents))
 
     def AddWin (self, opponent):
         """
@@ -156,70 +319,109 @@ class Glicko2:
         Update rating based on current results list, and clear results.
         """
 
-        # util func
-        def g (deviation):
-            """
-            Internal utility function.
-            """
-            return 1.0 / (math.sqrt(1.0 + 3.0 * deviation * deviation / (math.pi * math.pi)));
-
-        # util func
-        def E (rating, rating_opponent, deviation_opponent):
-            """
-            Internal utility function.
-            """
-            return 1.0 / (1.0 + math.exp(-g(deviation_opponent)*(rating - rating_opponent)));
-
         # bail if no opponents set
-        if len(self.__opponents) == 0:
+        if len(self.__results) == 0:
             return
 
-        # compute variance
-        variance = 0.0
-        for opp in self.__opponents:
-            g_i        = g(opp.__deviation)
-            E_i        = E(self.__rating,opp.__rating,opp.__deviation)
-            variance  += g_i * g_i * E_i * (1.0 - E_i)
-        variance = 1.0 / variance
-
-        # compute delta
-        delta = 0.0
-        for i in range(len(self.__opponents)):
-            delta += g(self.__opponents[i].__deviation) * (self.__results[i] - E(self.__rating, self.__opponents[i].__rating, self.__opponents[i].__deviation))
-        delta *= variance
-
-        # determine new volatility
-        new_volatility = 0.0
-        a              = math.log( math.pow(self.__volatility,2.0) )
-        x              = 0.0
-        x_new          = a
-        while ( abs(x - x_new) > 0.0000001 ):
-            x     = x_new;
-            d     = math.pow(self.__deviation,2.0) + variance + math.exp(x)
-            h1    = -(x - a)/(math.pow(self.dvolatility,2.0)) - 0.5*math.exp(x)/d + 0.5*math.exp(x)*(delta/d)*(delta/d)
-            h2    = -1.0/(math.pow(self.dvolatility,2.0)) - 0.5*math.exp(x)*(math.pow(self.__deviation,2.0)+variance)/(pow(d,2.0)) + 0.5*(math.pow(delta,2.0))*math.exp(x)*((math.pow(self.__deviation,2.0)) + variance - math.exp(x))/(pow(d,3.0))
-            x_new = x - h1/h2
-        new_volatility = math.exp(x_new / 2.0)
-
-        # update the rating deviation to the new pre-rating period value
-        pre_deviation = math.sqrt( math.pow(self.__deviation,2.0) + math.pow(new_volatility,2.0) )
-
-        # update the rating and deviation
-        new_deviation = 1.0 / (math.sqrt( 1.0/(pow(pre_deviation,2.0)) + 1.0 / variance))
-        new_rating    = 0.0
-        for i in range(len(self.__opponents)):
-            new_rating += g(self.__opponents[i].__deviation) * (self.__results[i] - E(self.__rating, self.__opponents[i].__rating, self.__opponents[i].__deviation))
-        new_rating  = new_rating * pow(new_deviation,2.0)
-        new_rating += self.__rating
-
-        # copy new values
-        self.__rating     = new_rating
-        self.__deviation  = new_deviation
-        self.__volatility = new_volatility
+        # zero-copy float64 views over the typed result arrays
+        rat_opp = np.frombuffer(self.__opp_ratings)
+        dev_opp = np.frombuffer(self.__opp_deviations)
+        res_arr = np.frombuffer(self.__results)
+
+        # run the compiled numerical core and copy new values
+        self.__rating, self.__deviation, self.__volatility = _glicko2_update(
+            self.__rating, self.__deviation, self.__volatility,
+            rat_opp, dev_opp, res_arr, self.dvolatility)
 
         # wipe our result lists
         self.ClearResults()
 
+    @staticmethod
+    def UpdateAll (players, games = None):
+        """
+        Update a whole roster of players for one rating period.  Equivalent to
+        calling Update() on every player, but gathers all pending results into
+        flat structure-of-arrays form (CSR-style, with a row pointer per
+        player) so that g, E, variance, and delta are computed for the entire
+        roster in a few vectorized passes.  Players with no results are
+        skipped, exactly as in Update().
+
+        If games is given, it is an alternative to recording results with
+        AddResult(): an iterable of (i, j, result) triples indexing into
+        players, where result is the score from player i's perspective and
+        player j is credited with the mirrored score.  In this form no
+        per-game snapshots are stored at all -- every game references the
+        roster's pre-period state, which is gathered exactly once.
+        """
+
+        players = list(players)
+
+        if games is not None:
+            # gather the shared pre-period state once; every game row
+            # references it by index instead of carrying its own snapshot
+            pre_rat = np.fromiter((p.__rating for p in players), dtype=np.float64, count=len(players))
+            pre_dev = np.fromiter((p.__deviation for p in players), dtype=np.float64, count=len(players))
+
+            opp_lists = [[] for _ in players]
+            res_lists = [[] for _ in players]
+            for i, j, result in games:
+                opp_lists[i].append(j)
+                res_lists[i].append(result)
+                opp_lists[j].append(i)
+                res_lists[j].append(1.0 - result)
+
+            active_idx = [i for i in range(len(players)) if len(opp_lists[i]) > 0]
+            active     = [players[i] for i in active_idx]
+            if len(active) == 0:
+                return
+
+            counts  = np.array([len(opp_lists[i]) for i in active_idx], dtype=np.int64)
+            row_ptr = np.zeros(len(active) + 1, dtype=np.int64)
+            np.cumsum(counts, out=row_ptr[1:])
+            total   = int(row_ptr[-1])
+
+            opp_idx = np.fromiter((j for i in active_idx for j in opp_lists[i]), dtype=np.int64, count=total)
+            rat_opp = pre_rat[opp_idx]
+            dev_opp = pre_dev[opp_idx]
+            res_arr = np.fromiter((r for i in active_idx for r in res_lists[i]), dtype=np.float64, count=total)
+        else:
+            active = [p for p in players if len(p.__results) > 0]
+            if len(active) == 0:
+                return
+
+            # flatten every player's opponent snapshots into one CSR structure
+            counts  = np.array([len(p.__results) for p in active], dtype=np.int64)
+            row_ptr = np.zeros(len(active) + 1, dtype=np.int64)
+            np.cumsum(counts, out=row_ptr[1:])
+
+            rat_opp = np.concatenate([np.frombuffer(p.__opp_ratings) for p in active])
+            dev_opp = np.concatenate([np.frombuffer(p.__opp_deviations) for p in active])
+            res_arr = np.concatenate([np.frombuffer(p.__results) for p in active])
+
+        ratings      = np.fromiter((p.__rating for p in active), dtype=np.float64, count=len(active))
+        deviations   = np.fromiter((p.__deviation for p in active), dtype=np.float64, count=len(active))
+        volatilities = np.fromiter((p.__volatility for p in active), dtype=np.float64, count=len(active))
+        rat_rep      = np.repeat(ratings, counts)
+
+        # compute g and E over the whole flat array at once
+        g_arr = 1.0 / np.sqrt(1.0 + _INV_PI2_TIMES_3 * dev_opp * dev_opp)
+        E_arr = 1.0 / (1.0 + np.exp(-g_arr * (rat_rep - rat_opp)))
+
+        # per-player reductions for variance and the delta numerator
+        variance  = 1.0 / np.add.reduceat(g_arr * g_arr * E_arr * (1.0 - E_arr), row_ptr[:-1])
+        delta_sum = np.add.reduceat(g_arr * (res_arr - E_arr), row_ptr[:-1])
+
+        # solve every player's volatility Newton iteration in parallel
+        new_r, new_d, new_v = _newton_all(ratings, deviations, volatilities,
+                                          variance, delta_sum, Glicko2.dvolatility)
+
+        # copy new values back into the player objects
+        for i, p in enumerate(active):
+            p.__rating     = new_r[i]
+            p.__deviation  = new_d[i]
+            p.__volatility = new_v[i]
+            p.ClearResults()
+
 
 
 # test code
@@ -236,5 +438,5 @@ if __name__ == "__main__":
 
     A.Update();
 
-    print "rating",A.GetRating(), "deviation",A.GetDeviation()
+    print("rating",A.GetRating(), "deviation",A.GetDeviation())
 
@@ -0,0 +1,35 @@
+# cython: boundscheck=False, cdivision=True
+"""
+Compiled Newton solver for the Glicko-2 volatility update.
+
+Drop-in alternative to the Numba-jitted solver in glicko2.py, for
+deployments where numba is unavailable or its import cost is unacceptable.
+Build in place with:
+
+    python setup.py build_ext --inplace
+"""
+
+from libc.math cimport exp, fabs
+
+
+cpdef double solve_volatility(double a, double dev2, double variance, double delta2, double tau2) nogil:
+    """
+    Newton solve for the new volatility.  Takes a = ln(volatility^2) plus the
+    squared loop invariants, iterates to relative convergence (capped to
+    bound worst-case latency), and returns the new volatility.
+    """
+    cdef double x, x_new, ex, d, d2, h1, h2
+    cdef int i
+
+    x_new = a
+    for i in range(30):
+        x     = x_new
+        ex    = exp(x)
+        d     = dev2 + variance + ex
+        d2    = d * d
+        h1    = -(x - a)/tau2 - 0.5*ex/d + 0.5*ex*delta2/d2
+        h2    = -1.0/tau2 - 0.5*ex*(dev2 + variance)/d2 + 0.5*delta2*ex*(dev2 + variance - ex)/(d*d2)
+        x_new = x - h1/h2
+        if fabs(x - x_new) <= 0.0000001 * (1.0 + fabs(x_new)):
+            break
+    return exp(x_new / 2.0)
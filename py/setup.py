@@ -0,0 +1,10 @@
+from setuptools import setup
+from Cython.Build import cythonize
+
+setup(
+    name="glicko2_core",
+    ext_modules=cythonize(
+        "glicko2_core.pyx",
+        compiler_directives={"boundscheck": False, "cdivision": True},
+    ),
+)
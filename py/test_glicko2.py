@@ -0,0 +1,87 @@
+from glicko2 import Glicko2
+
+
+def test_simple():
+    a = Glicko2(1500.0, 200.0, 0.06)
+    b = Glicko2(1400.0,  30.0, 0.06)
+    c = Glicko2(1550.0, 100.0, 0.06)
+    d = Glicko2(1700.0, 300.0, 0.06)
+
+    a.AddWin(b)
+    a.AddLoss(c)
+    a.AddResult(d, Glicko2.LOSS)
+
+    assert a.GetRating() == 1500.0
+    assert a.GetDeviation() == 200.0
+
+    a.Update()
+
+    assert abs(a.GetRating() - 1464.05) <= 0.01
+    assert abs(a.GetDeviation() - 151.516) <= 0.01
+
+
+def test_add_results():
+    a = Glicko2(1500.0, 200.0, 0.06)
+    b = Glicko2(1400.0,  30.0, 0.06)
+    c = Glicko2(1550.0, 100.0, 0.06)
+    d = Glicko2(1700.0, 300.0, 0.06)
+
+    a.AddWin(b)
+    a.AddResults([c, d], Glicko2.LOSS)
+
+    a.Update()
+
+    assert abs(a.GetRating() - 1464.05) <= 0.01
+    assert abs(a.GetDeviation() - 151.516) <= 0.01
+
+
+def test_update_all():
+    a = Glicko2(1500.0, 200.0, 0.06)
+    b = Glicko2(1400.0,  30.0, 0.06)
+    c = Glicko2(1550.0, 100.0, 0.06)
+    d = Glicko2(1700.0, 300.0, 0.06)
+
+    a.AddWin(b)
+    a.AddLoss(c)
+    a.AddResult(d, Glicko2.LOSS)
+    b.AddLoss(a)
+    c.AddWin(a)
+
+    # batched update must match the sequential per-player Update
+    expected = []
+    for p in [a, b, c, d]:
+        q = Glicko2(p.GetRating(), p.GetDeviation(), p.GetVolatility())
+        expected.append(q)
+    expected[0].AddWin(expected[1])
+    expected[0].AddLoss(expected[2])
+    expected[0].AddResult(expected[3], Glicko2.LOSS)
+    expected[1].AddLoss(expected[0])
+    expected[2].AddWin(expected[0])
+    for q in expected:
+        q.Update()
+
+    Glicko2.UpdateAll([a, b, c, d])
+
+    for p, q in zip([a, b, c, d], expected):
+        assert abs(p.GetRating() - q.GetRating()) <= 1e-9
+        assert abs(p.GetDeviation() - q.GetDeviation()) <= 1e-9
+        assert abs(p.GetVolatility() - q.GetVolatility()) <= 1e-9
+
+
+def test_update_all_games():
+    a = Glicko2(1500.0, 200.0, 0.06)
+    b = Glicko2(1400.0,  30.0, 0.06)
+    c = Glicko2(1550.0, 100.0, 0.06)
+    d = Glicko2(1700.0, 300.0, 0.06)
+
+    # same period expressed as index triples; no per-game snapshots stored
+    games = [
+        (0, 1, Glicko2.WIN),
+        (0, 2, Glicko2.LOSS),
+        (0, 3, Glicko2.LOSS),
+    ]
+
+    Glicko2.UpdateAll([a, b, c, d], games)
+
+    assert abs(a.GetRating() - 1464.05) <= 0.01
+    assert abs(a.GetDeviation() - 151.516) <= 0.01